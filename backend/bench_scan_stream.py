@@ -0,0 +1,114 @@
+"""
+Compares the /scan NDJSON protocols: time-to-first-finding, total time,
+bytes on the wire and (optionally) the server's peak memory.
+
+Usage (from backend/, with the API running):
+    python bench_scan_stream.py dengue --limit 1000 --server-pid <uvicorn pid>
+
+Every variant runs cold by default: requests pass nocache=true, so each one
+re-runs NER and skips the shared scan cache. An untimed warm-up request first
+caches the PubMed abstracts, so all variants share the same footing and PubMed
+latency is left out. Pass --warm to measure the cached path (protocol overhead
+only). --server-pid resets and reads VmHWM in /proc (Linux only).
+"""
+import argparse
+import json
+import time
+import urllib.parse
+import urllib.request
+import zlib
+
+VARIANTS = [
+    ("v1", {"protocol": 1}),
+    ("v2", {"protocol": 2}),
+    ("v2+gzip", {"protocol": 2, "compress": "gzip"}),
+]
+
+
+def reset_peak_rss(pid):
+    # Writing 5 to clear_refs resets VmHWM to the current RSS
+    try:
+        with open(f"/proc/{pid}/clear_refs", "w") as f:
+            f.write("5")
+    except OSError as e:
+        print(f"Could not reset peak RSS for {pid}: {e}")
+
+
+def peak_rss_mb(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def run_scan(base_url, virus, limit, params):
+    query = urllib.parse.urlencode({"limit": limit, **params})
+    url = f"{base_url}/scan/{urllib.parse.quote(virus)}?{query}"
+    gzipped = params.get("compress") == "gzip"
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzipped else None
+
+    start = time.time()
+    first_finding = None
+    wire_bytes = 0
+    buffer = b""
+    summary = None
+
+    request = urllib.request.Request(url, headers={"Accept-Encoding": "gzip" if gzipped else "identity"})
+    with urllib.request.urlopen(request, timeout=3600) as resp:
+        while True:
+            chunk = resp.read1(65536)
+            if not chunk:
+                break
+            wire_bytes += len(chunk)
+            buffer += decoder.decompress(chunk) if decoder else chunk
+
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if not line.strip():
+                    continue
+                event = json.loads(line)
+                status = event.get("status")
+                # v1 delivers findings only inside the final "complete" event
+                if first_finding is None and (status == "finding" or (status == "complete" and event.get("v") is None)):
+                    first_finding = time.time() - start
+                if status in ("complete", "error"):
+                    summary = event
+
+    return {
+        "ttff_s": first_finding,
+        "total_s": time.time() - start,
+        "wire_kb": wire_bytes / 1024,
+        "status": summary.get("status") if summary else "truncated",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the /scan streaming protocols.")
+    parser.add_argument("virus")
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--server-pid", type=int, help="PID of the API process to report peak RSS")
+    parser.add_argument("--warm", action="store_true", help="Let variants use the shared scan/NER caches")
+    parser.add_argument("--variants", nargs="+", choices=[name for name, _ in VARIANTS],
+                        default=[name for name, _ in VARIANTS])
+    args = parser.parse_args()
+
+    cold = {} if args.warm else {"nocache": "true"}
+    # Untimed warm-up: caches search results and abstracts (and, with --warm, the analysis)
+    run_scan(args.url, args.virus, args.limit, {"protocol": 2, **cold})
+
+    print(f"{'variant':>8} {'first finding':>14} {'total':>9} {'wire KB':>10} {'peak RSS MB':>12} status")
+    for name, params in VARIANTS:
+        if name not in args.variants:
+            continue
+        if args.server_pid:
+            reset_peak_rss(args.server_pid)
+        row = run_scan(args.url, args.virus, args.limit, {**params, **cold})
+        peak = f"{peak_rss_mb(args.server_pid):.1f}" if args.server_pid else "-"
+        ttff = f"{row['ttff_s']:.2f}s" if row["ttff_s"] is not None else "-"
+        print(f"{name:>8} {ttff:>14} {row['total_s']:>8.2f}s {row['wire_kb']:>10.1f} {peak:>12} {row['status']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Measures memory per added worker and aggregate requests/sec for serve.py.
+
+For each worker count it starts `serve.py --cpu --workers N`, waits for all
+workers, sums PSS (proportional set size, so copy-on-write pages shared with
+the master are split fairly) over the process tree, then fires concurrent
+requests for a fixed duration.
+
+Usage (from backend/, Linux only because it reads /proc):
+    python bench_workers.py --workers 1 2 4
+
+The default path passes nocache=true, so every request runs NER inference
+(only the PubMed abstracts are cached). The first request is a warm-up that
+caches those abstracts, which keeps PubMed latency out of the req/s figure.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def read_kb(pid, filename, field):
+    """Reads one 'Field:   123 kB' line from /proc/<pid>/<filename>."""
+    try:
+        with open(f"/proc/{pid}/{filename}") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except (FileNotFoundError, ProcessLookupError, PermissionError):
+        pass
+    return 0
+
+
+def child_pids(pid):
+    pids = []
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                pids.extend(int(p) for p in f.read().split())
+    except FileNotFoundError:
+        pass
+    return pids
+
+
+def tree_memory(master_pid):
+    """Returns (total PSS MB, total RSS MB, worker count) for the master and its workers."""
+    pids = [master_pid] + child_pids(master_pid)
+    pss = sum(read_kb(p, "smaps_rollup", "Pss") for p in pids)
+    rss = sum(read_kb(p, "status", "VmRSS") for p in pids)
+    return pss / 1024, rss / 1024, len(pids) - 1
+
+
+def wait_ready(base_url, proc, workers, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"serve.py exited with code {proc.returncode}")
+        try:
+            with urllib.request.urlopen(base_url + "/", timeout=2):
+                if len(child_pids(proc.pid)) >= workers:
+                    return
+        except OSError:
+            pass
+        time.sleep(1)
+    raise TimeoutError(f"Server not ready after {timeout}s")
+
+
+def fetch(url):
+    with urllib.request.urlopen(url, timeout=600) as resp:
+        resp.read()
+    return True
+
+
+def load_test(url, concurrency, duration):
+    """Runs `concurrency` clients in a closed loop for `duration` seconds; returns requests/sec."""
+    deadline = time.time() + duration
+
+    def client():
+        done = 0
+        while time.time() < deadline:
+            try:
+                fetch(url)
+                done += 1
+            except OSError:
+                pass
+        return done
+
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        total = sum(pool.map(lambda _: client(), range(concurrency)))
+    return total / (time.time() - start)
+
+
+def bench(workers, args):
+    base_url = f"http://127.0.0.1:{args.port}"
+    cmd = [sys.executable, "serve.py", "--cpu", "--workers", str(workers), "--port", str(args.port), "--host", "127.0.0.1"]
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        started = time.time()
+        wait_ready(base_url, proc, workers, args.startup_timeout)
+        startup = time.time() - started
+
+        fetch(base_url + args.path)  # Warm-up: caches the abstracts, not the analysis
+        rps = load_test(base_url + args.path, args.concurrency, args.duration)
+        pss, rss, count = tree_memory(proc.pid)
+        return {"workers": count, "startup_s": startup, "pss_mb": pss, "rss_mb": rss, "rps": rps}
+    finally:
+        proc.terminate()
+        proc.wait(timeout=60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark serve.py memory and throughput per worker count.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--path", default="/scan/dengue?limit=20&nocache=true",
+                        help="Drop nocache=true to measure the cached path instead of inference")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=int, default=30, help="Load test duration in seconds")
+    parser.add_argument("--startup-timeout", type=int, default=600)
+    args = parser.parse_args()
+
+    if not sys.platform.startswith("linux"):
+        sys.exit("bench_workers.py reads /proc and only runs on Linux.")
+
+    rows = [bench(n, args) for n in args.workers]
+
+    print(f"\n{'workers':>7} {'startup':>9} {'PSS MB':>9} {'RSS MB':>9} {'MB/added worker':>16} {'req/s':>8}")
+    for prev, row in zip([None] + rows, rows):
+        per_worker = "-"
+        if prev and row["workers"] > prev["workers"]:
+            per_worker = f"{(row['pss_mb'] - prev['pss_mb']) / (row['workers'] - prev['workers']):.1f}"
+        print(f"{row['workers']:>7} {row['startup_s']:>8.1f}s {row['pss_mb']:>9.1f} {row['rss_mb']:>9.1f} "
+              f"{per_worker:>16} {row['rps']:>8.1f}")
+    print("\nRSS counts shared pages once per process; PSS splits them, so compare PSS.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import hashlib
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+# One SQLite file on local disk is shared by every worker process.
+# Override with BIOSCAN_CACHE_PATH (e.g. to put it on a faster disk).
+CACHE_PATH = os.environ.get(
+    "BIOSCAN_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "bioscan_cache.sqlite3"),
+)
+DEFAULT_TTL = 24 * 3600  # seconds
+
+
+def make_key(*parts):
+    """Builds a stable, fixed-length cache key from arbitrary string parts."""
+    raw = "\x1f".join(str(p) for p in parts)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class SharedCache:
+    """
+    Process-safe key/value cache backed by a local SQLite file.
+    All uvicorn/gunicorn workers open the same file, so an abstract fetched,
+    an NER result computed, or a scan analyzed by one worker is reused by the others.
+    Cache failures are logged and never interrupt a request.
+    """
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        self._local = threading.local()
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            # Throwaway connection: the instance is created at import time, possibly in a
+            # gunicorn master, and no SQLite connection may be inherited across fork().
+            conn = sqlite3.connect(self.path, timeout=30)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS cache ("
+                    "namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, "
+                    "expires_at REAL NOT NULL, PRIMARY KEY (namespace, key))"
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError) as e:
+            # e.g. a read-only cache directory: requests still work, just uncached
+            logger.warning(f"⚠️ Shared cache unavailable at {self.path}: {e}")
+
+    def close(self):
+        """Closes this thread's connection (e.g. in a master process before forking workers)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            conn.close()
+        self._local.conn = None
+        self._local.pid = None
+
+    def _connect(self):
+        # SQLite connections must not cross fork() or threads:
+        # keep one per (process, thread) and reopen after a fork.
+        pid = os.getpid()
+        if getattr(self._local, "pid", None) != pid:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = pid
+        return self._local.conn
+
+    def get(self, namespace, key, default=None):
+        return self.get_many(namespace, [key]).get(key, default)
+
+    def get_many(self, namespace, keys):
+        """Returns a dict of {key: value} for the keys that are present and not expired."""
+        keys = list(keys)
+        if not keys:
+            return {}
+
+        found = {}
+        stale = []
+        try:
+            conn = self._connect()
+            now = time.time()
+            # Stay below SQLite's default bound-parameter limit
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT key, value FROM cache WHERE namespace = ? AND expires_at > ? "
+                    f"AND key IN ({placeholders})",
+                    [namespace, now, *chunk],
+                )
+                for key, value in rows:
+                    try:
+                        found[key] = pickle.loads(value)
+                    except Exception as e:
+                        # Truncated blob, or a pickle from an older numpy/transformers
+                        # (ModuleNotFoundError, AttributeError, EOFError...): treat as a miss.
+                        logger.warning(f"⚠️ Dropping unreadable cache entry ({namespace}): {e!r}")
+                        stale.append(key)
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Cache read failed ({namespace}): {e}")
+
+        if stale:
+            self.delete_many(namespace, stale)
+        return found
+
+    def delete_many(self, namespace, keys):
+        try:
+            conn = self._connect()
+            conn.executemany(
+                "DELETE FROM cache WHERE namespace = ? AND key = ?",
+                [(namespace, key) for key in keys],
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Cache delete failed ({namespace}): {e}")
+
+    def set(self, namespace, key, value, ttl=DEFAULT_TTL):
+        self.set_many(namespace, {key: value}, ttl=ttl)
+
+    def set_many(self, namespace, items, ttl=DEFAULT_TTL):
+        if not items:
+            return
+
+        expires_at = time.time() + ttl
+        try:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                [
+                    (namespace, key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), expires_at)
+                    for key, value in items.items()
+                ],
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Cache write failed ({namespace}): {e}")
+
+    def prune(self):
+        """Deletes expired entries. Safe to call from any worker."""
+        try:
+            conn = self._connect()
+            conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Cache prune failed: {e}")
+
+    def clear(self, namespace=None):
+        try:
+            conn = self._connect()
+            if namespace is None:
+                conn.execute("DELETE FROM cache")
+            else:
+                conn.execute("DELETE FROM cache WHERE namespace = ?", (namespace,))
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Cache clear failed: {e}")
+
+
+# Shared instance used by the scraper, the NLP engine and the API
+cache = SharedCache()
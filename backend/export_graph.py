@@ -0,0 +1,61 @@
+"""
+Bulk export of the knowledge graph (same data as GET /export).
+Tables: candidates (Drug-Virus edges with evidence), mentions (Drug-Paper edges).
+
+Usage (from backend/):
+    python export_graph.py -o candidates.parquet
+    python export_graph.py --table mentions --format csv --virus dengue -o dengue_mentions.csv
+    python export_graph.py --format arrow > candidates.arrows
+
+Rows are streamed from Neo4j page by page and written as they arrive,
+so memory stays bounded regardless of graph size.
+"""
+import argparse
+import logging
+import sys
+
+from exporter import EXPORT_FORMATS, check_format, iter_export
+from graph_db import BioGraphDB, NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, EXPORT_TABLES, EXPORT_PAGE_SIZE, MAX_EXPORT_PAGE_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the BioScan knowledge graph.")
+    parser.add_argument("--table", choices=sorted(EXPORT_TABLES), default="candidates")
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="parquet")
+    parser.add_argument("--virus", help="Only export viruses whose name contains this (case-insensitive)")
+    parser.add_argument("--drug", help="Only export drugs whose name contains this (case-insensitive)")
+    parser.add_argument("--page-size", type=int, default=EXPORT_PAGE_SIZE)
+    parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    args = parser.parse_args()
+
+    try:
+        check_format(args.format)
+    except ValueError as e:
+        sys.exit(str(e))
+    if not 1 <= args.page_size <= MAX_EXPORT_PAGE_SIZE:
+        sys.exit(f"--page-size must be between 1 and {MAX_EXPORT_PAGE_SIZE}.")
+
+    graph_db = BioGraphDB(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
+    if not graph_db.driver:
+        sys.exit("Could not connect to Neo4j.")
+
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    written = 0
+    try:
+        pages = graph_db.iter_export_rows(args.table, virus=args.virus, drug=args.drug, page_size=args.page_size)
+        for chunk in iter_export(pages, EXPORT_TABLES[args.table], args.format):
+            out.write(chunk)
+            written += len(chunk)
+    finally:
+        if args.output:
+            out.close()
+        graph_db.close()
+
+    logger.info(f"✅ Exported {written / 1024 / 1024:.1f} MB of {args.format}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    main()
@@ -0,0 +1,107 @@
+import csv
+import io
+
+# pyarrow is optional: it is only needed for the columnar (Parquet/Arrow) exports.
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# --- EXPORT FORMATS ---
+# format -> (media type, file extension)
+EXPORT_FORMATS = {
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "csv": ("text/csv", "csv"),
+}
+COLUMNAR_FORMATS = {"parquet", "arrow"}
+
+# Low-cardinality columns stored as dictionary<int32, string> in Parquet/Arrow
+DICTIONARY_COLUMNS = {"drug", "virus", "confidence"}
+
+
+def check_format(fmt):
+    """Raises ValueError if `fmt` is unknown or its optional dependency is missing."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported format '{fmt}'. Use one of {sorted(EXPORT_FORMATS)}.")
+    if fmt in COLUMNAR_FORMATS and pa is None:
+        raise ValueError(f"Format '{fmt}' requires pyarrow (pip install pyarrow).")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that buffers what a writer emits until it is drained."""
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _arrow_schema(columns):
+    return pa.schema([
+        pa.field(name, pa.dictionary(pa.int32(), pa.string()) if name in DICTIONARY_COLUMNS else pa.string())
+        for name in columns
+    ])
+
+
+def _arrow_batch(page, columns, schema):
+    """Converts one page of row tuples into a RecordBatch, dictionary-encoding name columns."""
+    arrays = []
+    for name, values in zip(columns, zip(*page)):
+        array = pa.array(values, type=pa.string())
+        arrays.append(array.dictionary_encode() if name in DICTIONARY_COLUMNS else array)
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def iter_export(pages, columns, fmt):
+    """
+    Encodes an iterator of row pages (lists of tuples in `columns` order) as a byte stream.
+    Only one page is held in memory at a time:
+    - parquet: one row group per page (zstd), footer written at the end
+    - arrow: Arrow IPC stream, one record batch per page
+    - csv: header, then one chunk per page
+    """
+    check_format(fmt)
+
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for page in pages:
+            writer.writerows(page)
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+        return
+
+    schema = _arrow_schema(columns)
+    sink = _ChunkSink()
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    else:
+        # The stream format (unlike the file format) allows a new dictionary per batch
+        writer = pa.ipc.new_stream(sink, schema)
+
+    with writer:
+        for page in pages:
+            writer.write_batch(_arrow_batch(page, columns, schema))
+            yield sink.drain()
+    yield sink.drain()
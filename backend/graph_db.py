@@ -1,25 +1,58 @@
-from neo4j import GraphDatabase
+from neo4j import GraphDatabase, READ_ACCESS
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
+# --- CONFIGURATION ---
+# Neo4j Aura Instance (override with environment variables)
+NEO4J_URI = os.environ.get("NEO4J_URI", "neo4j+s://81767515.databases.neo4j.io")
+NEO4J_USER = os.environ.get("NEO4J_USER", "neo4j")
+NEO4J_PASSWORD = os.environ.get("NEO4J_PASSWORD", "utSBg1cWvOQgEPnJf_DWfcsFIT4UlCmQQ1Jo1S2MN3M")
+
+# Bulk export tables, each one row per real edge:
+# candidates: (Drug)-[:POTENTIAL_CANDIDATE]->(Virus), mentions: (Drug)-[:MENTIONED_IN]->(Paper).
+# Candidate edges do not record their source paper, so the two are not joined into triples.
+EXPORT_TABLES = {
+    "candidates": ("drug", "virus", "confidence", "evidence", "last_updated"),
+    "mentions": ("drug", "paper_id", "paper_title"),
+}
+EXPORT_PAGE_SIZE = 10000
+MAX_EXPORT_PAGE_SIZE = 100000  # Upper bound on rows held in memory per page
+
 class BioGraphDB:
     """
     Handles all interactions with the Neo4j Graph Database.
     Implements connection pooling and transaction management.
     """
     def __init__(self, uri, user, password):
+        self.uri = uri
+        self.auth = (user, password)
         self.driver = None
+        self.connect()
+
+    def connect(self):
+        """
+        Opens the driver (and its connection pool).
+        Forked workers call this again so no sockets are shared with the parent process.
+        Leaves self.driver as None if the server cannot be reached.
+        """
+        driver = None
         try:
-            self.driver = GraphDatabase.driver(uri, auth=(user, password))
-            self.driver.verify_connectivity()
+            driver = GraphDatabase.driver(self.uri, auth=self.auth)
+            driver.verify_connectivity()
+            self.driver = driver
             logger.info("✅ Connected to Neo4j Graph Database")
         except Exception as e:
+            self.driver = None
+            if driver is not None:
+                driver.close()
             logger.warning(f"⚠️ Failed to connect to Neo4j: {e}")
 
     def close(self):
         if self.driver:
             self.driver.close()
+            self.driver = None
 
     def add_interaction(self, drug, virus, paper_title, evidence, pmid=None):
         """
@@ -190,4 +223,48 @@ class BioGraphDB:
                 "papers": record["papers"]
             })
         
-        return interactions
\ No newline at end of file
+        return interactions
+
+    def iter_export_rows(self, table="candidates", virus=None, drug=None, page_size=EXPORT_PAGE_SIZE):
+        """
+        Streams one export table (see EXPORT_TABLES), optionally filtered by virus/drug name.
+        For "mentions", the virus filter keeps drugs that are candidates for a matching virus.
+        Records are pulled from a server-side cursor `page_size` at a time,
+        so memory stays bounded no matter how large the graph is.
+        Yields pages (lists of tuples in EXPORT_TABLES[table] order).
+        """
+        if not self.driver:
+            return
+
+        with self.driver.session(default_access_mode=READ_ACCESS, fetch_size=page_size) as session:
+            with session.begin_transaction() as tx:
+                result = tx.run(self._export_query(table), virus=virus, drug=drug)
+
+                page = []
+                for record in result:
+                    page.append(tuple(record.values()))
+                    if len(page) >= page_size:
+                        yield page
+                        page = []
+                if page:
+                    yield page
+
+    @staticmethod
+    def _export_query(table):
+        if table == "candidates":
+            return (
+                "MATCH (d:Drug)-[r:POTENTIAL_CANDIDATE]->(v:Virus) "
+                "WHERE ($virus IS NULL OR toLower(v.name) CONTAINS toLower($virus)) "
+                "AND ($drug IS NULL OR toLower(d.name) CONTAINS toLower($drug)) "
+                "RETURN d.name AS drug, v.name AS virus, COALESCE(r.confidence, 'High') AS confidence, "
+                "r.evidence AS evidence, toString(r.last_updated) AS last_updated"
+            )
+        if table == "mentions":
+            return (
+                "MATCH (d:Drug)-[:MENTIONED_IN]->(p:Paper) "
+                "WHERE ($drug IS NULL OR toLower(d.name) CONTAINS toLower($drug)) "
+                "AND ($virus IS NULL OR EXISTS { "
+                "MATCH (d)-[:POTENTIAL_CANDIDATE]->(v:Virus) WHERE toLower(v.name) CONTAINS toLower($virus) }) "
+                "RETURN d.name AS drug, toString(p.id) AS paper_id, p.title AS paper_title"
+            )
+        raise ValueError(f"Unknown export table '{table}'. Use one of {sorted(EXPORT_TABLES)}.")
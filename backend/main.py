@@ -1,11 +1,17 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
-from scraper import fetch_papers
-from nlp_model import analyze_batch
-from graph_db import BioGraphDB
+from starlette.concurrency import iterate_in_threadpool
+from scraper import fetch_papers, iter_papers
+from nlp_model import analyze_batch, iter_analyze
+from graph_db import BioGraphDB, NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, EXPORT_TABLES, EXPORT_PAGE_SIZE, MAX_EXPORT_PAGE_SIZE
+from exporter import EXPORT_FORMATS, check_format, iter_export
+from cache import cache, make_key
+from streaming import (
+    PROTOCOL_VERSION, SUPPORTED_PROTOCOLS, SUPPORTED_COMPRESSION, make_event, encode_stream
+)
+from typing import Optional
 import time
-import json
 import asyncio
 
 # --- APP SETUP ---
@@ -22,15 +28,25 @@ app.add_middleware(
 # Initialize Neo4j Connection
 # Using Neo4j Aura Instance
 try:
-    graph_db = BioGraphDB("neo4j+s://81767515.databases.neo4j.io", "neo4j", "utSBg1cWvOQgEPnJf_DWfcsFIT4UlCmQQ1Jo1S2MN3M")
+    graph_db = BioGraphDB(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
 except Exception as e:
     print(f"Skipping DB connection due to error: {e}")
     # Dummy mock
     class MockDB:
         driver = None
+        def connect(self): pass
+        def close(self): pass
         def add_interaction(self, *args, **kwargs): pass
+        def iter_export_rows(self, *args, **kwargs): return iter(())
     graph_db = MockDB()
 
+# Scan results are shared by all workers through the local cache (see cache.py).
+# Findings are stored batch by batch ("scan_batch") and only become visible once a
+# small manifest ("scan_manifest") is written at the end of a complete scan, so no
+# scan has to hold every finding in memory. Batches outlive their manifest.
+SCAN_CACHE_TTL = 3600
+SCAN_BATCH_TTL = 2 * SCAN_CACHE_TTL
+
 @app.get("/")
 def home():
     """
@@ -42,47 +58,162 @@ def home():
         "graph_connection": graph_db.driver is not None
     }
 
+def save_findings(virus_name, paper):
+    """Writes every match of one analyzed paper to the Knowledge Graph."""
+    for match in paper['matches']:
+        graph_db.add_interaction(
+            drug=match['drug'], 
+            virus=virus_name, 
+            paper_title=paper['title'], 
+            evidence=match['context'],
+            pmid=paper.get('pmid')
+        )
+
+def cache_scan_batch(scan_key, index, findings):
+    cache.set("scan_batch", make_key(scan_key, index), findings, ttl=SCAN_BATCH_TTL)
+
+def cache_scan_manifest(scan_key, scanned_count, batches, relevant_findings):
+    manifest = {"scanned_count": scanned_count, "batches": batches, "relevant_findings": relevant_findings}
+    cache.set("scan_manifest", scan_key, manifest, ttl=SCAN_CACHE_TTL)
+
+def iter_cached_findings(scan_key, manifest):
+    """Yields a cached scan's findings, loading one batch at a time."""
+    for index in range(manifest["batches"]):
+        batch = cache.get("scan_batch", make_key(scan_key, index))
+        if batch is None:
+            print(f"Cached scan batch {index} expired before its manifest")
+            continue
+        yield from batch
+
+def stream_scan(virus_name, limit, nocache=False):
+    """
+    Protocol v2 scan (blocking generator, run in a threadpool):
+    fetches and analyzes papers batch by batch and yields a "finding" event per
+    relevant paper as soon as it is ready, then a small "complete" summary.
+    At most one batch of papers and its findings is held in memory at a time.
+    """
+    start_time = time.time()
+    
+    try:
+        yield make_event("progress", percent=10, stage="Connecting to PubMed...")
+
+        scan_key = make_key(virus_name.lower().strip(), limit)
+        manifest = None if nocache else cache.get("scan_manifest", scan_key)
+
+        if manifest:
+            yield make_event("progress", percent=80, stage="Loading cached analysis...")
+            scanned_count, relevant_findings = manifest["scanned_count"], manifest["relevant_findings"]
+            for paper in iter_cached_findings(scan_key, manifest):
+                yield make_event("finding", data=paper)
+        else:
+            scanned_count = 0
+            relevant_findings = 0
+            batches = 0
+
+            fetch_stats = {}
+            for papers in iter_papers(virus_name, limit=limit, stats=fetch_stats):
+                scanned_count += len(papers)
+                percent = min(95, 10 + int(85 * scanned_count / max(limit, 1)))
+                yield make_event("progress", percent=percent, stage=f"Analyzing papers ({scanned_count}/{limit})...")
+
+                findings = []
+                for paper in iter_analyze(papers, use_cache=not nocache):
+                    if graph_db.driver:
+                        save_findings(virus_name, paper)
+                    findings.append(paper)
+                    yield make_event("finding", data=paper)
+
+                relevant_findings += len(findings)
+                if findings and not nocache:
+                    cache_scan_batch(scan_key, batches, findings)
+                    batches += 1
+
+            if not scanned_count:
+                yield make_event("error", message="No papers found on PubMed.")
+                return
+
+            # A partial result (some PubMed batches failed) must not be served to every worker
+            if not nocache and not fetch_stats["failed_batches"]:
+                cache_scan_manifest(scan_key, scanned_count, batches, relevant_findings)
+
+        duration = round(time.time() - start_time, 2)
+
+        yield make_event("complete", data={
+            "target": virus_name,
+            "scanned_count": scanned_count,
+            "relevant_findings": relevant_findings,
+            "execution_time": f"{duration}s"
+        })
+
+    except Exception as e:
+        # Catch-all for unexpected errors during stream
+        print(f"Error during scan: {e}")
+        yield make_event("error", message=f"An unexpected error occurred: {str(e)}")
+
 @app.get("/scan/{virus_name}")
-async def scan_virus(virus_name: str, limit: int = 50):
+async def scan_virus(virus_name: str, limit: int = 50, protocol: int = 1, compress: Optional[str] = None,
+                     nocache: bool = False):
     """
     Orchestrates the virus scanning process:
     1. Fetches research papers from PubMed.
     2. Analyzes text using NLP to find drug interactions.
     3. Updates the Neo4j Knowledge Graph.
     4. Streams progress updates to the client.
+
+    protocol=2 streams each paper's findings as its own NDJSON event (see streaming.py);
+    protocol=1 (default) sends all results in the final event.
+    compress=gzip gzip-encodes the stream.
+    nocache=true bypasses the shared scan and NER caches (abstracts are still cached),
+    so the models always run.
     """
+    if protocol not in SUPPORTED_PROTOCOLS:
+        raise HTTPException(status_code=400, detail=f"Unsupported protocol {protocol}. Use one of {SUPPORTED_PROTOCOLS}.")
+    if compress is not None and compress not in SUPPORTED_COMPRESSION:
+        raise HTTPException(status_code=400, detail=f"Unsupported compression '{compress}'. Use one of {SUPPORTED_COMPRESSION}.")
+
     async def process_stream():
         start_time = time.time()
         
         try:
             # 1. Research Phase
-            yield json.dumps({"status": "progress", "percent": 10, "stage": "Connecting to PubMed..."}) + "\n"
+            yield {"status": "progress", "percent": 10, "stage": "Connecting to PubMed..."}
             await asyncio.sleep(0.5) # UX pause
             
-            yield json.dumps({"status": "progress", "percent": 30, "stage": f"Fetching {limit} papers..."}) + "\n"
-            papers = fetch_papers(virus_name, limit=limit)
-            
-            if not papers:
-                yield json.dumps({"status": "error", "message": "No papers found on PubMed."}) + "\n"
-                return
+            scan_key = make_key(virus_name.lower().strip(), limit)
+            manifest = None if nocache else cache.get("scan_manifest", scan_key)
 
-            # 2. Analysis Phase
-            yield json.dumps({"status": "progress", "percent": 50, "stage": "Analyzing medical text for interactions..."}) + "\n"
-            results = analyze_batch(papers)
-            
-            # 3. Output Phase
-            yield json.dumps({"status": "progress", "percent": 80, "stage": "Constructing Knowledge Graph..."}) + "\n"
-            
-            if graph_db.driver and results:
-                for paper in results:
-                    for match in paper['matches']:
-                        graph_db.add_interaction(
-                            drug=match['drug'], 
-                            virus=virus_name, 
-                            paper_title=paper['title'], 
-                            evidence=match['context'],
-                            pmid=paper.get('pmid')
-                        )
+            if manifest:
+                # Another worker (or an earlier request) already ran this scan;
+                # its interactions are already in the graph.
+                yield {"status": "progress", "percent": 80, "stage": "Loading cached analysis..."}
+                scanned_count = manifest["scanned_count"]
+                results = list(iter_cached_findings(scan_key, manifest))
+            else:
+                yield {"status": "progress", "percent": 30, "stage": f"Fetching {limit} papers..."}
+                fetch_stats = {}
+                papers = fetch_papers(virus_name, limit=limit, stats=fetch_stats)
+                
+                if not papers:
+                    yield {"status": "error", "message": "No papers found on PubMed."}
+                    return
+
+                # 2. Analysis Phase
+                yield {"status": "progress", "percent": 50, "stage": "Analyzing medical text for interactions..."}
+                results = analyze_batch(papers, use_cache=not nocache)
+                scanned_count = len(papers)
+                
+                # 3. Output Phase
+                yield {"status": "progress", "percent": 80, "stage": "Constructing Knowledge Graph..."}
+                
+                if graph_db.driver and results:
+                    for paper in results:
+                        save_findings(virus_name, paper)
+
+                # A partial result (some PubMed batches failed) must not be served to every worker
+                if not nocache and not fetch_stats["failed_batches"]:
+                    if results:
+                        cache_scan_batch(scan_key, 0, results)
+                    cache_scan_manifest(scan_key, scanned_count, 1 if results else 0, len(results))
 
             duration = round(time.time() - start_time, 2)
             
@@ -90,20 +221,26 @@ async def scan_virus(virus_name: str, limit: int = 50):
                 "status": "complete",
                 "data": {
                     "target": virus_name,
-                    "scanned_count": len(papers),
+                    "scanned_count": scanned_count,
                     "relevant_findings": len(results),
                     "execution_time": f"{duration}s",
                     "data": results
                 }
             }
-            yield json.dumps(final_response) + "\n"
+            yield final_response
             
         except Exception as e:
             # Catch-all for unexpected errors during stream
             print(f"Error during scan: {e}")
-            yield json.dumps({"status": "error", "message": f"An unexpected error occurred: {str(e)}"}) + "\n"
+            yield {"status": "error", "message": f"An unexpected error occurred: {str(e)}"}
 
-    return StreamingResponse(process_stream(), media_type="application/x-ndjson")
+    if protocol == PROTOCOL_VERSION:
+        events = iterate_in_threadpool(stream_scan(virus_name, limit, nocache=nocache))
+    else:
+        events = process_stream()
+
+    headers = {"Content-Encoding": "gzip"} if compress == "gzip" else None
+    return StreamingResponse(encode_stream(events, compress), media_type="application/x-ndjson", headers=headers)
 
 @app.get("/graph/{virus_name}")
 def get_graph(virus_name: str):
@@ -127,6 +264,31 @@ def get_data(virus_name: str):
         
     return graph_db.get_virus_data(virus_name)
 
+@app.get("/export")
+def export_graph(fmt: str = Query("parquet", alias="format"), table: str = "candidates",
+                 virus: Optional[str] = None, drug: Optional[str] = None,
+                 page_size: int = Query(EXPORT_PAGE_SIZE, ge=1, le=MAX_EXPORT_PAGE_SIZE)):
+    """
+    Streams one table of the knowledge graph (or a virus/drug filtered subset)
+    as Parquet, an Arrow IPC stream, or chunked CSV:
+    - candidates: Drug-Virus edges with evidence
+    - mentions: Drug-Paper edges
+    Drug/virus names are dictionary-encoded in the columnar formats.
+    """
+    try:
+        check_format(fmt)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if table not in EXPORT_TABLES:
+        raise HTTPException(status_code=400, detail=f"Unknown table '{table}'. Use one of {sorted(EXPORT_TABLES)}.")
+    if not graph_db.driver:
+        raise HTTPException(status_code=503, detail="Graph database unavailable.")
+
+    media_type, extension = EXPORT_FORMATS[fmt]
+    pages = graph_db.iter_export_rows(table, virus=virus, drug=drug, page_size=page_size)
+    headers = {"Content-Disposition": f'attachment; filename="bioscan_{table}.{extension}"'}
+    return StreamingResponse(iter_export(pages, EXPORT_TABLES[table], fmt), media_type=media_type, headers=headers)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
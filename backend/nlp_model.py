@@ -1,5 +1,7 @@
 import torch
 from transformers import pipeline
+from cache import cache, make_key
+import os
 import re
 import logging
 
@@ -7,19 +9,25 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # --- GPU SETUP ---
-# Explicitly checks for NVIDIA GPU availability
-DEVICE = 0 if torch.cuda.is_available() else -1
+# Explicitly checks for NVIDIA GPU availability.
+# BIOSCAN_FORCE_CPU=1 keeps the models on CPU so they can be shared by forked workers (see serve.py).
+FORCE_CPU = os.environ.get("BIOSCAN_FORCE_CPU", "").lower() in ("1", "true", "yes")
+DEVICE = 0 if torch.cuda.is_available() and not FORCE_CPU else -1
 device_name = torch.cuda.get_device_name(0) if DEVICE == 0 else "CPU"
 print(f"⚡ [AI Engine] Loading Models on: {device_name}")
 
 # --- MODEL LOADING ---
+CHEMICAL_MODEL = "alvaroalon2/biobert_chemical_ner"
+NER_CACHE_TTL = 30 * 24 * 3600  # NER output only changes when the model does
+INFERENCE_BATCH_SIZE = 32
+
 # We use DUAL MODELS to ensure high precision.
 try:
     # Model 1: Specific for Chemicals (Drugs)
     logger.info("Loading Chemical BERT...")
     chemical_pipeline = pipeline(
         "ner", 
-        model="alvaroalon2/biobert_chemical_ner", 
+        model=CHEMICAL_MODEL, 
         aggregation_strategy="simple", 
         device=DEVICE
     )
@@ -58,7 +66,7 @@ def split_into_sentences(text):
     # Look for periods followed by a space and a capital letter, ensuring we don't split "E. coli"
     return re.split(r'(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\?)\s', text)
 
-def analyze_batch(papers_list):
+def analyze_batch(papers_list, use_cache=True):
     """
     Main Logic Pipeline:
     1. Receive papers
@@ -66,54 +74,84 @@ def analyze_batch(papers_list):
     3. Filter results using Blacklist
     4. Validate results using Context Matching (Sentence Level)
     """
-    if not papers_list: 
-        return []
+    return list(iter_analyze(papers_list, use_cache=use_cache))
+
+def iter_analyze(papers_list, use_cache=True):
+    """
+    Generator version of analyze_batch: runs inference one GPU batch at a time
+    and yields each relevant paper as soon as its batch is done.
+    use_cache=False always runs the model (e.g. to benchmark inference).
+    """
+    for start in range(0, len(papers_list), INFERENCE_BATCH_SIZE):
+        batch = papers_list[start:start + INFERENCE_BATCH_SIZE]
+        chemical_results = extract_chemicals(batch, use_cache=use_cache)
 
+        for paper, entities in zip(batch, chemical_results):
+            analyzed = validate_paper(paper, entities)
+            if analyzed:
+                yield analyzed
+
+def extract_chemicals(papers_list, use_cache=True):
+    """Runs the Chemical BERT on a batch of papers, reusing cached NER output."""
     # Prepare inputs (Truncate to 512 tokens for BERT speed compliance)
     abstracts = [p['abstract'][:512] for p in papers_list] 
     
-    logger.info(f"Running inference on {len(abstracts)} abstracts...")
+    # Reuse NER output from the shared cache (filled by any worker)
+    keys = [make_key(CHEMICAL_MODEL, text) for text in abstracts]
+    cached = cache.get_many("ner", keys) if use_cache else {}
+    pending = [i for i, key in enumerate(keys) if key not in cached]
+
+    logger.info(f"Running inference on {len(pending)} abstracts ({len(abstracts) - len(pending)} cached)...")
     
     # Batch Inference
-    chemical_results = chemical_pipeline(abstracts, batch_size=32)
+    if pending:
+        fresh = chemical_pipeline([abstracts[i] for i in pending], batch_size=INFERENCE_BATCH_SIZE)
+        computed = {keys[i]: entities for i, entities in zip(pending, fresh)}
+        if use_cache:
+            cache.set_many("ner", computed, ttl=NER_CACHE_TTL)
+        cached.update(computed)
+
+    return [cached[key] for key in keys]
+
+def validate_paper(paper, entities):
+    """
+    Filters one paper's entities and keeps those mentioned in an interaction sentence.
+    Returns {pmid, title, matches} or None if nothing survives.
+    """
+    text = paper['abstract']
+    sentences = split_into_sentences(text)
+    
+    # --- LOGIC STEP 1: Entity Extraction & Filtering ---
+    found_chemicals = set()
+    for c in entities:
+        word = c['word'].lower().strip()
+        # Heuristic: Must be >3 chars, high confidence, and NOT in blacklist
+        if c['score'] > 0.85 and len(word) > 3 and word not in BLACKLIST:
+            # Store original casing from text if possible, or just the word
+            found_chemicals.add(c['word']) 
     
-    analyzed_data = []
+    valid_connections = []
 
-    for i, paper in enumerate(papers_list):
-        text = paper['abstract']
-        sentences = split_into_sentences(text)
+    # --- LOGIC STEP 2: Contextual Validation ---
+    for sentence in sentences:
+        sent_lower = sentence.lower()
         
-        # --- LOGIC STEP 1: Entity Extraction & Filtering ---
-        found_chemicals = set()
-        for c in chemical_results[i]:
-            word = c['word'].lower().strip()
-            # Heuristic: Must be >3 chars, high confidence, and NOT in blacklist
-            if c['score'] > 0.85 and len(word) > 3 and word not in BLACKLIST:
-                # Store original casing from text if possible, or just the word
-                found_chemicals.add(c['word']) 
-        
-        valid_connections = []
-
-        # --- LOGIC STEP 2: Contextual Validation ---
-        for sentence in sentences:
-            sent_lower = sentence.lower()
-            
-            # Check if this sentence discusses an Interaction
-            if any(kw in sent_lower for kw in INTERACTION_KEYWORDS):
-                # Check if any identified chemical is in this specific sentence
-                for chemical in found_chemicals:
-                    if chemical in sentence:
-                        valid_connections.append({
-                            "drug": chemical,
-                            "context": sentence, # Evidence
-                            "confidence": "High"
-                        })
-
-        if valid_connections:
-            analyzed_data.append({
-                "pmid": paper.get('pmid'),
-                "title": paper['title'],
-                "matches": valid_connections
-            })
-            
-    return analyzed_data
\ No newline at end of file
+        # Check if this sentence discusses an Interaction
+        if any(kw in sent_lower for kw in INTERACTION_KEYWORDS):
+            # Check if any identified chemical is in this specific sentence
+            for chemical in found_chemicals:
+                if chemical in sentence:
+                    valid_connections.append({
+                        "drug": chemical,
+                        "context": sentence, # Evidence
+                        "confidence": "High"
+                    })
+
+    if not valid_connections:
+        return None
+
+    return {
+        "pmid": paper.get('pmid'),
+        "title": paper['title'],
+        "matches": valid_connections
+    }
@@ -1,11 +1,14 @@
 from Bio import Entrez
 import time
 import logging
+from cache import cache, make_key
 
 # --- CONFIGURATION ---
 # REQUIRED: Replace with your actual email to comply with NCBI policies
 Entrez.email = "shubhamgupta73110@gmail.com" 
 BATCH_SIZE = 50
+SEARCH_CACHE_TTL = 3600          # New papers appear daily; keep ID lists short-lived
+ABSTRACT_CACHE_TTL = 7 * 24 * 3600  # Abstracts rarely change once indexed
 
 # Setup robust logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -23,83 +26,127 @@ def safe_get(dictionary, keys, default=None):
             return default
     return dictionary
 
-def fetch_papers(keyword, limit=50):
+def parse_article(article):
+    """
+    Extracts {pmid, title, abstract} from one PubmedArticle record.
+    Handles cases where the abstract is a list (structured) or string (unstructured).
+    """
+    citation = article['MedlineCitation']
+    pmid = str(citation['PMID'])
+
+    article_data = citation['Article']
+    title = str(article_data.get('ArticleTitle', 'No Title'))
+
+    # Robust Abstract Extraction
+    abstract_raw = safe_get(article_data, ['Abstract', 'AbstractText'], [])
+    if isinstance(abstract_raw, list):
+        abstract = " ".join([str(x) for x in abstract_raw])
+    else:
+        abstract = str(abstract_raw)
+
+    return {"pmid": pmid, "title": title, "abstract": abstract}
+
+def fetch_papers(keyword, limit=50, stats=None):
     """
     Fetches papers from PubMed with:
     1. Retry logic (network resilience)
     2. Batch processing (API rate limit compliance)
     3. Recursive parsing (Data structure resilience)
+    4. Shared cache (search results and abstracts reused across workers)
     """
+    return [paper for batch in iter_papers(keyword, limit=limit, stats=stats) for paper in batch]
+
+def iter_papers(keyword, limit=50, stats=None):
+    """
+    Generator version of fetch_papers: yields each batch of valid papers
+    (up to BATCH_SIZE) as soon as it is fetched, so analysis can start early.
+    If a `stats` dict is given, stats["failed_batches"] counts fetches that failed,
+    so callers can tell a complete result from a partial one.
+    """
+    if stats is None:
+        stats = {}
+    stats["failed_batches"] = 0
+
     logger.info(f"🚀 [Scraper] Searching PubMed for: '{keyword}' (Limit: {limit})...")
     
     try:
         # 1. Search for IDs
-        # We try 3 times before giving up to handle transient network issues
-        for attempt in range(3):
-            try:
-                handle = Entrez.esearch(db="pubmed", term=keyword, retmax=limit)
-                record = Entrez.read(handle)
-                handle.close()
-                break
-            except Exception as e:
-                if attempt == 2: raise e
-                logger.warning(f"Search timeout. Retrying ({attempt+1}/3)...")
-                time.sleep(2)
-
-        id_list = record.get("IdList", [])
+        # ID lists are shared across workers, so repeated scans of a target skip ESearch
+        search_key = make_key(keyword.lower().strip(), limit)
+        id_list = cache.get("search", search_key)
+
+        if id_list is None:
+            # We try 3 times before giving up to handle transient network issues
+            for attempt in range(3):
+                try:
+                    handle = Entrez.esearch(db="pubmed", term=keyword, retmax=limit)
+                    record = Entrez.read(handle)
+                    handle.close()
+                    break
+                except Exception as e:
+                    if attempt == 2: raise e
+                    logger.warning(f"Search timeout. Retrying ({attempt+1}/3)...")
+                    time.sleep(2)
+
+            id_list = [str(pmid) for pmid in record.get("IdList", [])]
+            cache.set("search", search_key, id_list, ttl=SEARCH_CACHE_TTL)
+
         if not id_list:
             logger.warning("No papers found for this query.")
-            return []
+            return
 
         logger.info(f"✅ Found {len(id_list)} IDs. Fetching details...")
-        papers = []
+        extracted = 0
 
         # 2. Fetch Details in Batches
-        # Processing in chunks prevents the 'Response too large' error
+        # Processing in chunks prevents the 'Response too large' error.
+        # Abstracts already in the shared cache are not fetched again.
         seen_pmids = set()
         for i in range(0, len(id_list), BATCH_SIZE):
             chunk = id_list[i:i + BATCH_SIZE]
-            
-            try:
-                handle = Entrez.efetch(db="pubmed", id=chunk, retmode="xml")
-                records = Entrez.read(handle)
-                handle.close()
-                
-                for article in records['PubmedArticle']:
-                    try:
-                        citation = article['MedlineCitation']
-                        
-                        # 1. Identify Uniqueness (PMID)
-                        pmid = str(citation['PMID'])
-                        if pmid in seen_pmids:
-                            continue
-                        seen_pmids.add(pmid)
-
-                        article_data = citation['Article']
-                        title = article_data.get('ArticleTitle', 'No Title')
-                        
-                        # Robust Abstract Extraction
-                        # Handles cases where abstract is a list (structured) or string (unstructured)
-                        abstract_raw = safe_get(article_data, ['Abstract', 'AbstractText'], [])
-                        if isinstance(abstract_raw, list):
-                            abstract = " ".join([str(x) for x in abstract_raw])
-                        else:
-                            abstract = str(abstract_raw)
-
-                        # Logic: Only keep papers with substantial content
-                        if abstract and len(abstract) > 50: 
-                            papers.append({"pmid": pmid, "title": title, "abstract": abstract})
-                            
-                    except Exception:
-                        continue # Skip malformed records silently
-                        
-            except Exception as e:
-                logger.error(f"Batch fetch failed: {e}")
-                time.sleep(1) # Polite backoff
-                
-        logger.info(f"✅ Successfully extracted {len(papers)} unique, valid abstracts.")
-        return papers
+            parsed = cache.get_many("abstract", chunk)
+            missing = [pmid for pmid in chunk if pmid not in parsed]
+
+            if missing:
+                try:
+                    handle = Entrez.efetch(db="pubmed", id=missing, retmode="xml")
+                    records = Entrez.read(handle)
+                    handle.close()
+
+                    fetched = {}
+                    for article in records['PubmedArticle']:
+                        try:
+                            paper = parse_article(article)
+                            fetched[paper['pmid']] = paper
+                        except Exception:
+                            continue # Skip malformed records silently
+
+                    cache.set_many("abstract", fetched, ttl=ABSTRACT_CACHE_TTL)
+                    parsed.update(fetched)
+
+                except Exception as e:
+                    logger.error(f"Batch fetch failed: {e}")
+                    stats["failed_batches"] += 1
+                    time.sleep(1) # Polite backoff
+
+            papers = []
+            for pmid in chunk:
+                paper = parsed.get(pmid)
+                # 1. Identify Uniqueness (PMID)
+                if paper is None or pmid in seen_pmids:
+                    continue
+                seen_pmids.add(pmid)
+
+                # Logic: Only keep papers with substantial content
+                if paper['abstract'] and len(paper['abstract']) > 50:
+                    papers.append(paper)
+
+            if papers:
+                extracted += len(papers)
+                yield papers
+
+        logger.info(f"✅ Successfully extracted {extracted} unique, valid abstracts.")
 
     except Exception as e:
         logger.critical(f"Critical Scraper Error: {e}")
-        return []
\ No newline at end of file
+        stats["failed_batches"] += 1
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""
+Multi-worker launcher for the BioScan API.
+
+Both BioBERT pipelines are loaded ONCE in the gunicorn master (preload_app)
+and uvicorn workers are forked from it, so model weights are shared
+copy-on-write instead of being re-imported by every worker. Abstracts, NER
+output and scan results are shared through the local SQLite cache (cache.py).
+
+Usage (from backend/):
+    python serve.py --workers 4 --port 8000
+
+Requires gunicorn (POSIX only) and CPU models (--cpu). On Windows, without
+gunicorn, or with GPU models, this falls back to a single uvicorn process.
+"""
+import argparse
+import gc
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def post_fork(server, worker):
+    """Per-worker setup after fork(): fresh DB sockets and a fair share of CPU threads."""
+    import torch
+    import main
+
+    main.graph_db.connect()
+
+    # N workers x all cores each would oversubscribe the CPU during inference
+    threads = max(1, (os.cpu_count() or 1) // server.cfg.workers)
+    torch.set_num_threads(threads)
+    logger.info(f"Worker {worker.pid} ready ({threads} inference threads)")
+
+
+def run_uvicorn(args):
+    """Single process, no fork: models are loaded in the process that serves them."""
+    import uvicorn
+    uvicorn.run("main:app", host=args.host, port=args.port)
+
+
+def run_gunicorn(args):
+    from gunicorn.app.base import BaseApplication
+
+    class BioScanApplication(BaseApplication):
+        def __init__(self, options):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            # Importing main loads the models (nlp_model) in the master process.
+            import main
+
+            # Sockets and SQLite handles must not cross fork(); workers reopen them lazily
+            # (the cache in _connect, the graph DB in post_fork).
+            main.graph_db.close()
+            main.cache.close()
+
+            # Move everything allocated so far into the permanent GC generation,
+            # so collections in the workers don't write to (and un-share) these pages.
+            gc.collect()
+            gc.freeze()
+            return main.app
+
+    options = {
+        "bind": f"{args.host}:{args.port}",
+        "workers": args.workers,
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": True,
+        "post_fork": post_fork,
+        "timeout": args.timeout,
+        "graceful_timeout": 30,
+    }
+    BioScanApplication(options).run()
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Run the BioScan API with shared model weights.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--timeout", type=int, default=300, help="Worker timeout in seconds (scans are slow)")
+    parser.add_argument("--cpu", action="store_true", help="Keep models on CPU (required to share them across workers)")
+    args = parser.parse_args()
+
+    if args.cpu:
+        os.environ["BIOSCAN_FORCE_CPU"] = "1"
+
+    # A CUDA context cannot survive fork(): a worker forked from a master that loaded
+    # GPU models cannot run inference. Serve GPU models from a single unforked process.
+    if not args.cpu:
+        import torch
+        if torch.cuda.is_available():
+            logger.warning("⚠️ CUDA detected: GPU models cannot be shared by forked workers. "
+                           "Running a single uvicorn process (pass --cpu to share CPU models across workers).")
+            run_uvicorn(args)
+            return
+
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        logger.warning("⚠️ gunicorn not available (Windows?). Falling back to a single uvicorn process.")
+        run_uvicorn(args)
+        return
+
+    run_gunicorn(args)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    run()
@@ -0,0 +1,46 @@
+import json
+import zlib
+
+# orjson is optional: it serializes events several times faster than stdlib json,
+# but the API keeps working without it.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# --- NDJSON SCAN PROTOCOL ---
+# v1: progress events, then ONE "complete" event carrying every paper's matches.
+# v2: progress events, one "finding" event per relevant paper as soon as it is analyzed,
+#     then a small "complete" summary (no per-paper data). Every v2 event carries "v": 2.
+PROTOCOL_VERSION = 2
+SUPPORTED_PROTOCOLS = (1, 2)
+SUPPORTED_COMPRESSION = ("gzip",)
+
+
+def make_event(status, **fields):
+    """Builds a v2 protocol event."""
+    return {"v": PROTOCOL_VERSION, "status": status, **fields}
+
+
+def encode_event(event):
+    """Serializes one event as a single NDJSON line (bytes)."""
+    if orjson is not None:
+        return orjson.dumps(event, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_SERIALIZE_NUMPY)
+    return (json.dumps(event) + "\n").encode("utf-8")
+
+
+async def encode_stream(events, compress=None):
+    """
+    Turns an async iterator of event dicts into NDJSON bytes.
+    With compress="gzip" the output is one gzip stream, sync-flushed after every
+    event so the client can decode each line as soon as it arrives.
+    """
+    if compress != "gzip":
+        async for event in events:
+            yield encode_event(event)
+        return
+
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for event in events:
+        yield compressor.compress(encode_event(event)) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
@@ -53,28 +53,35 @@ function Dashboard() {
         setProgressStage('Initializing...');
 
         try {
-            const response = await fetch(`http://localhost:8000/scan/${virusName}?limit=${limit}`, {
+            // Protocol v2 streams one "finding" event per paper, then a small summary
+            const response = await fetch(`http://localhost:8000/scan/${virusName}?limit=${limit}&protocol=2`, {
                 signal: controller.signal
             });
 
             const reader = response.body.getReader();
             const decoder = new TextDecoder();
+            let buffer = '';
+            let findings = 0;
 
             while (true) {
                 const { value, done } = await reader.read();
                 if (done) break;
 
-                const chunk = decoder.decode(value, { stream: true });
-                // Handle multiple JSON objects in one chunk
-                const lines = chunk.split('\n').filter(line => line.trim() !== '');
+                buffer += decoder.decode(value, { stream: true });
+                // Handle multiple JSON objects in one chunk; keep a trailing partial line for the next read
+                const lines = buffer.split('\n');
+                buffer = lines.pop();
 
-                for (const line of lines) {
+                for (const line of lines.filter(l => l.trim() !== '')) {
                     try {
                         const data = JSON.parse(line);
 
                         if (data.status === 'progress') {
                             setProgress(data.percent);
                             setProgressStage(data.stage);
+                        } else if (data.status === 'finding') {
+                            findings += 1;
+                            setProgressStage(`Found interactions in ${findings} paper${findings === 1 ? '' : 's'}...`);
                         } else if (data.status === 'complete') {
                             setResults(data.data);
                             setLoading(false);